@@ -0,0 +1,24 @@
+"""One-time conversion of the CSV datasets in data/ to Snappy-compressed Parquet.
+
+The Live page reads the Parquet copies when they exist, which skips CSV parsing
+and only loads the columns it needs. Re-run this after regenerating the CSVs.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+DATASETS = ["merged_data", "ml_predictions_2"]
+
+
+def convert(name: str) -> Path:
+    csv_path = DATA_DIR / f"{name}.csv"
+    parquet_path = DATA_DIR / f"{name}.parquet"
+    df = pd.read_csv(csv_path, parse_dates=["Date"])
+    df.to_parquet(parquet_path, compression="snappy", index=False)
+    return parquet_path
+
+
+if __name__ == "__main__":
+    for name in DATASETS:
+        print(f"Wrote {convert(name)}")
@@ -1,6 +1,6 @@
+import re
 import streamlit as st
 from streamlit_extras.metric_cards import style_metric_cards
-import plotly.graph_objects as go
 import pandas as pd
 
 # Page Config
@@ -11,10 +11,8 @@ st.set_page_config(
 )
 
 # Custom CSS
-st.markdown("""
+CSS = """
 <style>
-    [data-testid=stSidebar] {
-    }
     /* Disable click highlight */
     [data-testid=stSidebar] *:focus:not(:active) {
         outline: none !important;
@@ -43,7 +41,15 @@ st.markdown("""
         box-shadow: 0 2px 4px rgba(0,0,0,0.05);
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# The style element has to be re-sent on every rerun (Streamlit drops elements a run doesn't emit),
+# so send it with the whitespace collapsed, built once per server process.
+@st.cache_data(show_spinner=False)
+def minified_css() -> str:
+    return re.sub(r"\s+", " ", CSS).strip()
+
+st.markdown(minified_css(), unsafe_allow_html=True)
 
 # Sidebar
 with st.sidebar:
@@ -76,94 +82,91 @@ This application demonstrates our complete workflow from data extraction to mach
 for five major tech stocks.
 """)
 
-# Enhanced ETL Section
-with st.expander("🔧 **ETL Process (Extract-Transform-Load)**", expanded=True):
-    st.markdown("""
-    ### Data Extraction
-    We gathered financial data from SimFin's API with these key steps:
-    """)
-    
-    with st.container():
-        st.markdown("""
-        <div class="etl-step">
-            <h4>🔑 Authentication & Setup</h4>
-            <ul>
-                <li>Loaded API keys and paths from <code>.env</code> file using <code>python-dotenv</code></li>
-                <li>Configured SimFin API with proper authentication</li>
-                <li>Set up local cache directory for efficient data retrieval</li>
-            </ul>
-        </div>
-        
-        <div class="etl-step">
-            <h4>📥 Primary Datasets Extracted</h4>
-            <ul>
-                <li><strong>Company Information</strong>: Metadata including tickers, names, sectors (filtered to US market)</li>
-                <li><strong>Daily Share Prices</strong>: OHLCV data (Open, High, Low, Close, Volume) with historical records</li>
-            </ul>
-        </div>
-        
-        <div class="etl-step">
-            <h4>🔄 Alternative Data Source</h4>
-            <ul>
-                <li>Fallback to pre-downloaded CSV files when API unavailable</li>
-                <li>Local cache system for offline development</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("""
-    ### Data Transformation
-    The raw data underwent rigorous processing:
-    """)
-    
-    with st.container():
-        st.markdown("""
-        <div class="etl-step">
-            <h4>🎯 Company Filtering</h4>
-            <ul>
-                <li>Selected focus companies: AAPL, MSFT, AMZN, TSLA, META</li>
-                <li>Applied ticker-based filtering to both datasets</li>
-            </ul>
-        </div>
-        
-        <div class="etl-step">
-            <h4>🧹 Data Cleaning</h4>
-            <ul>
-                <li>Removed irrelevant columns (e.g., 'Dividend' from prices data)</li>
-                <li>Converted 'Date' to datetime format for time-series analysis</li>
-                <li>Verified no missing values in critical columns</li>
-            </ul>
-        </div>
-        
-        <div class="etl-step">
-            <h4>🤝 Dataset Merging</h4>
-            <ul>
-                <li>Joined company metadata with price data on 'Ticker' column</li>
-                <li>Used left join to preserve all price records</li>
-                <li>Ensured consistent date ranges across all companies</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("""
-    ### Data Loading
-    Final output preparation:
-    """)
-    
-    with st.container():
-        st.markdown("""
-        <div class="etl-step">
-            <ul>
-                <li>Saved merged dataset as CSV for future use</li>
-                <li>Structured format with columns: <code>[Date, Ticker, Open, High, Low, Close, Volume, CompanyName, Sector, ...]</code></li>
-                <li>Optimized data types for efficient storage</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Visualization for ETL
-    st.markdown("### ETL Process Overview")
-    etl_steps = pd.DataFrame({
+# Static page content, each expander body is sent as a single markdown message
+ETL_HTML = """
+### Data Extraction
+We gathered financial data from SimFin's API with these key steps:
+
+<div class="etl-step">
+    <h4>🔑 Authentication & Setup</h4>
+    <ul>
+        <li>Loaded API keys and paths from <code>.env</code> file using <code>python-dotenv</code></li>
+        <li>Configured SimFin API with proper authentication</li>
+        <li>Set up local cache directory for efficient data retrieval</li>
+    </ul>
+</div>
+
+<div class="etl-step">
+    <h4>📥 Primary Datasets Extracted</h4>
+    <ul>
+        <li><strong>Company Information</strong>: Metadata including tickers, names, sectors (filtered to US market)</li>
+        <li><strong>Daily Share Prices</strong>: OHLCV data (Open, High, Low, Close, Volume) with historical records</li>
+    </ul>
+</div>
+
+<div class="etl-step">
+    <h4>🔄 Alternative Data Source</h4>
+    <ul>
+        <li>Fallback to pre-downloaded CSV files when API unavailable</li>
+        <li>Local cache system for offline development</li>
+    </ul>
+</div>
+
+### Data Transformation
+The raw data underwent rigorous processing:
+
+<div class="etl-step">
+    <h4>🎯 Company Filtering</h4>
+    <ul>
+        <li>Selected focus companies: AAPL, MSFT, AMZN, TSLA, META</li>
+        <li>Applied ticker-based filtering to both datasets</li>
+    </ul>
+</div>
+
+<div class="etl-step">
+    <h4>🧹 Data Cleaning</h4>
+    <ul>
+        <li>Removed irrelevant columns (e.g., 'Dividend' from prices data)</li>
+        <li>Converted 'Date' to datetime format for time-series analysis</li>
+        <li>Verified no missing values in critical columns</li>
+    </ul>
+</div>
+
+<div class="etl-step">
+    <h4>🤝 Dataset Merging</h4>
+    <ul>
+        <li>Joined company metadata with price data on 'Ticker' column</li>
+        <li>Used left join to preserve all price records</li>
+        <li>Ensured consistent date ranges across all companies</li>
+    </ul>
+</div>
+
+### Data Loading
+Final output preparation:
+
+<div class="etl-step">
+    <ul>
+        <li>Saved merged dataset as CSV for future use</li>
+        <li>Structured format with columns: <code>[Date, Ticker, Open, High, Low, Close, Volume, CompanyName, Sector, ...]</code></li>
+        <li>Optimized data types for efficient storage</li>
+    </ul>
+</div>
+
+### ETL Process Overview
+"""
+
+FEATURES = [
+    ("📊 Daily Return", "Percentage change between closing prices"),
+    ("📈 Moving Averages", "5/10/20-day rolling windows"),
+    ("⚡ Volatility", "5-day standard deviation of closing prices"),
+    ("📊 Volume Ratio", "Current volume vs 5-day average"),
+    ("🎯 Price Range", "(High - Low)/Close price normalization")
+]
+
+# Built once and served from the cache on every rerun
+@st.cache_data(show_spinner=False)
+def etl_overview() -> pd.DataFrame:
+    return pd.DataFrame({
         'Phase': ['Extract', 'Transform', 'Load'],
         'Key Actions': [
             "API authentication, data download, local caching",
@@ -175,60 +178,38 @@ with st.expander("🔧 **ETL Process (Extract-Transform-Load)**", expanded=True)
             "pandas, numpy",
             "pandas, os"
         ]
-    })
-    
-    fig = go.Figure(data=[go.Table(
-        header=dict(
-            values=list(etl_steps.columns),
-            fill_color='#4a6bff',
-            font_color='white',
-            align='left'
-        ),
-        cells=dict(
-            values=[etl_steps.Phase, etl_steps['Key Actions'], etl_steps.Tools],
-            fill_color='#f8f9fa',
-            align='left'
-        ))
-    ])
-    st.plotly_chart(fig, use_container_width=True)
+    }).set_index('Phase')
+
+@st.cache_data(show_spinner=False)
+def ml_html() -> str:
+    feature_cards = "\n".join(
+        f'<div class="feature-card"><strong>{name}</strong>: {desc}</div>' for name, desc in FEATURES
+    )
+    return f"""
+### Why XGBoost Regressor?
+We chose **XGBoost Regressor** because it:
+- Predicts the actual next day's closing price (continuous value)
+- Allows conversion to binary classification (up/down)
+- Handles tabular financial data exceptionally well
+- Provides feature importance metrics
+
+### Feature Engineering
+We created these predictive features:
+
+{feature_cards}
+
+### Target Variable
+```python
+# Binary classification target
+df['Target'] = (df['Close'].shift(-1) > df['Close']).astype(int)
+```
+"""
+
+# Enhanced ETL Section
+with st.expander("🔧 **ETL Process (Extract-Transform-Load)**", expanded=True):
+    st.markdown(ETL_HTML, unsafe_allow_html=True)
+    st.table(etl_overview())
 
 # ML Section (unchanged)
 with st.expander("🤖 **Machine Learning Pipeline**", expanded=True):
-    st.markdown("""
-    ### Why XGBoost Regressor?
-    We chose **XGBoost Regressor** because it:
-    - Predicts the actual next day's closing price (continuous value)
-    - Allows conversion to binary classification (up/down)
-    - Handles tabular financial data exceptionally well
-    - Provides feature importance metrics
-    """)
-    
-    st.markdown("""
-    ### Feature Engineering
-    We created these predictive features:
-    """)
-    
-    # Feature cards
-    features = [
-        ("📊 Daily Return", "Percentage change between closing prices"),
-        ("📈 Moving Averages", "5/10/20-day rolling windows"),
-        ("⚡ Volatility", "5-day standard deviation of closing prices"),
-        ("📊 Volume Ratio", "Current volume vs 5-day average"),
-        ("🎯 Price Range", "(High - Low)/Close price normalization")
-    ]
-    
-    for name, desc in features:
-        with st.container():
-            st.markdown(f"""
-            <div class="feature-card">
-                <strong>{name}</strong>: {desc}
-            </div>
-            """, unsafe_allow_html=True)
-    
-    st.markdown("""
-    ### Target Variable
-    ```python
-    # Binary classification target
-    df['Target'] = (df['Close'].shift(-1) > df['Close']).astype(int)
-    ```
-    """)
\ No newline at end of file
+    st.markdown(ml_html(), unsafe_allow_html=True)
@@ -1,10 +1,9 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
-from streamlit_pandas_profiling import st_profile_report
-from ydata_profiling import ProfileReport  
+import plotly.graph_objects as go
 from pathlib import Path
-from sklearn.metrics import mean_absolute_error, accuracy_score
 
 
 # --- Page Configuration ---
@@ -13,6 +12,141 @@ st.set_page_config(
     page_icon="🚀",
 )
 
+# --- Data Paths ---
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"  # Two levels up from 'pages/' to the root folder
+
+# Only the columns this page actually uses are read from disk
+MERGED_COLUMNS = ["Date", "Ticker", "Close"]
+PREDICTION_COLUMNS = ["Date", "Ticker", "Close", "Predicted_Close"]
+
+def data_path(name: str) -> Path:
+    # Prefer the Parquet copy written by convert_to_parquet.py, but fall back to the original CSV
+    # when the CSV has been regenerated since, so the page never shows a stale conversion
+    parquet_path = DATA_DIR / f"{name}.parquet"
+    csv_path = DATA_DIR / f"{name}.csv"
+    if parquet_path.exists() and (
+        not csv_path.exists() or parquet_path.stat().st_mtime >= csv_path.stat().st_mtime
+    ):
+        return parquet_path
+    return csv_path
+
+def read_columns(path: str, columns: list[str]) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns, parse_dates=["Date"])
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    # Only a handful of tickers, so store them as a category; prices fit comfortably in float32.
+    # Volume is left out on purpose: share counts would lose precision as float32.
+    df["Ticker"] = df["Ticker"].astype("category")
+    for col in ("Open", "High", "Low", "Close", "Predicted_Close"):
+        if col in df:
+            df[col] = pd.to_numeric(df[col], downcast="float")
+    return df
+
+# --- Data Loaders ---
+def load_merged(path: str) -> pd.DataFrame:
+    return compact_dtypes(read_columns(path, MERGED_COLUMNS)).sort_values(["Ticker", "Date"])
+
+def load_predictions(path: str) -> pd.DataFrame:
+    df = compact_dtypes(read_columns(path, PREDICTION_COLUMNS)).sort_values(["Ticker", "Date"])
+    # Daily up/down flags, computed once per ticker for the direction accuracy metric
+    by_ticker = df.groupby("Ticker", observed=True)
+    df["Close_up"] = (by_ticker["Close"].diff() > 0).astype("int8")
+    df["Pred_up"] = (by_ticker["Predicted_Close"].diff() > 0).astype("int8")
+    return df
+
+# --- Cached Per-Ticker Data ---
+# Keyed on the path string so the loaded data is shared across reruns and sessions. The merged
+# data is only cached here: cache_resource hands back the same dict on every call instead of
+# deep-copying the frames, so ticker switches are a dict lookup. Callers must treat the frames
+# as read-only.
+@st.cache_resource(show_spinner=False)
+def per_ticker(path: str) -> dict[str, pd.DataFrame]:
+    df = load_merged(path)
+    return {
+        ticker: group.reset_index(drop=True)
+        for ticker, group in df.groupby("Ticker", observed=True, sort=False)
+    }
+
+# Same idea as per_ticker, but the predictions are only ever plotted and reduced, so each ticker
+# is stored as plain NumPy arrays that Plotly and the metrics consume without any DataFrame copies.
+@st.cache_resource(show_spinner=False)
+def predictions_by_ticker(path: str) -> dict[str, dict[str, np.ndarray]]:
+    df = load_predictions(path)
+    return {
+        ticker: {
+            "Date": group["Date"].to_numpy(),
+            "Close": group["Close"].to_numpy(),
+            "Predicted_Close": group["Predicted_Close"].to_numpy(),
+            "Close_up": group["Close_up"].to_numpy(),
+            "Pred_up": group["Pred_up"].to_numpy(),
+            "Actual": group["Close"].notna().to_numpy(),  # False for the future prediction rows
+        }
+        for ticker, group in df.groupby("Ticker", observed=True, sort=False)
+    }
+
+def slice_ticker(frames: dict[str, pd.DataFrame], ticker: str, start, end) -> pd.DataFrame:
+    if ticker not in frames:
+        return pd.DataFrame(columns=MERGED_COLUMNS)
+    # Dates are sorted within each ticker, so the range is two binary searches and a positional slice
+    df_ticker = frames[ticker]
+    dates = df_ticker["Date"].to_numpy()
+    lo = np.searchsorted(dates, np.datetime64(start).astype(dates.dtype))
+    hi = np.searchsorted(dates, np.datetime64(end).astype(dates.dtype), side="right")
+    return df_ticker.iloc[lo:hi]
+
+# --- Cached Figure Builders ---
+# Keyed on the user inputs so a rerun with unchanged selections skips figure construction.
+# Date ranges are arbitrary, so the price figures are capped to bound server memory.
+@st.cache_data(show_spinner=False, max_entries=64)
+def build_price_fig(path: str, ticker: str, start, end):
+    df_filtered = slice_ticker(per_ticker(path), ticker, start, end)
+    fig = px.line(
+        df_filtered, 
+        x="Date", 
+        y="Close", 
+        title=f"{ticker} Closing Prices Over Time", 
+        render_mode="webgl",
+        labels={"Date": "Date", "Close": "Closing Price ($)"}
+    )
+    fig.update_layout(
+        xaxis_title="Date",
+        yaxis_title="Closing Price ($)",
+        template="plotly_white"
+    )
+    return fig
+
+@st.cache_data(show_spinner=False)
+def build_prediction_fig(path: str, ticker: str):
+    series = predictions_by_ticker(path)[ticker]
+    actual, future = series["Actual"], ~series["Actual"]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=series["Date"][actual], y=series["Close"][actual], mode="lines", name="Close"))
+    fig.add_trace(go.Scattergl(
+        x=series["Date"][actual], y=series["Predicted_Close"][actual], mode="lines", name="Predicted_Close"
+    ))
+
+    # Add future prediction if available
+    if future.any():
+        fig.add_trace(go.Scatter(
+            x=series["Date"][future],
+            y=series["Predicted_Close"][future],
+            mode='markers',
+            name='Future Prediction',
+            marker=dict(color='red', size=10)
+        ))
+
+    fig.update_layout(
+        title=f"{ticker} Actual vs Predicted Closing Prices",
+        xaxis_title="Date",
+        yaxis_title="Closing Price ($)",
+        legend_title_text="Legend",
+        template="plotly_white"
+    )
+    return fig
+
 # --- Title and Description ---
 st.title("Historical Market Data & Predictions")
 st.markdown(""" Access real-time historical market data and detailed analytics for your selected stock.
@@ -24,28 +158,21 @@ tickers = ["AAPL", "MSFT", "AMZN", "TSLA", "META"]
 selected_ticker = st.sidebar.selectbox("Select Stock Ticker", tickers)
 start_date = st.sidebar.date_input("Start Date", pd.to_datetime("2020-01-01"))
 end_date = st.sidebar.date_input("End Date", pd.Timestamp.today())
+start_ts, end_ts = pd.Timestamp(start_date), pd.Timestamp(end_date)
 
 # --- Load Data Button ---
 if st.sidebar.button("Load Data"):
     # --- Load Dataset ---
-    # --- Define the Path to Your Data File ---
-    BASE_DIR = Path(__file__).resolve().parent.parent  # Two levels up from 'pages/' to the root folder
-
-    merged_data_path = BASE_DIR / "data" / "merged_data.csv"
+    merged_data_path = data_path("merged_data")
 
     # --- Load the Dataset Safely ---
     if merged_data_path.exists():
-        df = pd.read_csv(merged_data_path, parse_dates=["Date"])
-        #st.write(df.head())  # Display the data to confirm it's loaded correctly
+        frames = per_ticker(str(merged_data_path))
     else:
         st.error(f"File not found: {merged_data_path}")
 
     # --- Filter Dataset ---
-    df_filtered = df[
-        (df["Ticker"] == selected_ticker) & 
-        (df["Date"] >= pd.to_datetime(start_date)) & 
-        (df["Date"] <= pd.to_datetime(end_date))
-    ]
+    df_filtered = slice_ticker(frames, selected_ticker, start_ts, end_ts)
 
     # --- Display Summary Metrics for the Selected Ticker ---
     st.subheader(f"Closing Price Metrics for {selected_ticker}")
@@ -53,10 +180,9 @@ if st.sidebar.button("Load Data"):
     if df_filtered.empty:
         st.warning(f"No data available for {selected_ticker}.")
     else:
-        # Calculate metrics for the 'Close' price from the filtered data
-        low_price = df_filtered["Close"].min()
-        high_price = df_filtered["Close"].max()
-        mean_price = df_filtered["Close"].mean()
+        # Calculate metrics for the 'Close' price from the filtered data in a single agg call
+        stats = df_filtered["Close"].agg(["min", "max", "mean"])
+        low_price, high_price, mean_price = stats["min"], stats["max"], stats["mean"]
 
         # Calculate deltas relative to the mean
         delta_low = low_price - mean_price    # This will be negative
@@ -86,124 +212,91 @@ if st.sidebar.button("Load Data"):
 
         # --- Stock Price Chart ---
         st.subheader("Stock Price Chart")
-        fig = px.line(
-            df_filtered, 
-            x="Date", 
-            y="Close", 
-            title=f"{selected_ticker} Closing Prices Over Time", 
-            labels={"Date": "Date", "Close": "Closing Price ($)"}
+        st.plotly_chart(
+            build_price_fig(str(merged_data_path), selected_ticker, start_ts, end_ts),
+            use_container_width=True
         )
-        fig.update_layout(
-            xaxis_title="Date",
-            yaxis_title="Closing Price ($)",
-            template="plotly_white"
-        )
-        st.plotly_chart(fig, use_container_width=True)
 
-# ... (keep all your previous imports and setup code)
+# --- Predicted vs Actual Section ---
+# Only rendered while the toggle below is on, so until the user asks for it no rerun loads the
+# predictions, builds the chart or computes the metrics. As a fragment, changing its ticker
+# reruns only this section instead of the whole page.
+@st.fragment
+def render_predictions_section():
+    ml_predictions_path = data_path("ml_predictions_2")
 
-BASE_DIR = Path(__file__).resolve().parent.parent
-ml_predictions_path = BASE_DIR / "data" / "ml_predictions_2.csv"
+    if ml_predictions_path.exists():
+        predictions = predictions_by_ticker(str(ml_predictions_path))
+    else:
+        st.error(f"File not found: {ml_predictions_path}")
+        return
 
-if ml_predictions_path.exists():
-    df_preds = pd.read_csv(ml_predictions_path, parse_dates=["Date"])
-else:
-    st.error(f"File not found: {ml_predictions_path}")
-    st.stop()  # Stop execution if file not found
+    st.markdown("""
+    Here choose a ticker and you will see a graph comparing the actual closing prices versus the predicted ones from our
+    proprietary Machine Learning model.
+    """)
 
-st.subheader("Predicted vs Actual Closing Price")
-st.markdown("""
-Here choose a ticker and you will see a graph comparing the actual closing prices versus the predicted ones from our
-            proprietary Machine Learning model.
-""")
+    # --- User Selection ---
+    selected_ticker = st.selectbox("Select a Ticker", sorted(predictions))
 
-# --- User Selection ---
-selected_ticker = st.selectbox("Select a Ticker", sorted(df_preds["Ticker"].unique()))
+    # --- ML Predictions for the Ticker ---
+    series = predictions[selected_ticker]
+    actual, future = series["Actual"], ~series["Actual"]
 
-# --- Filter ML Predictions ---
-df_preds_filtered = df_preds[df_preds["Ticker"] == selected_ticker]
+    # Plot the chart
+    st.plotly_chart(build_prediction_fig(str(ml_predictions_path), selected_ticker), use_container_width=True)
 
-# Separate historical data (with actuals) and future prediction
-historical_data = df_preds_filtered[df_preds_filtered['Close'].notna()]
-future_prediction = df_preds_filtered[df_preds_filtered['Close'].isna()]
+    # Show future prediction in a text box if available
+    if future.any():
+        next_date = pd.Timestamp(series["Date"][future][0]).strftime('%Y-%m-%d')
+        next_pred = series["Predicted_Close"][future][0]
+        st.success(f"🚀 Next day prediction ({next_date}): ${next_pred:.2f}")
 
-# Plot the chart
-fig = px.line(
-    historical_data,
-    x="Date",
-    y=["Close", "Predicted_Close"],
-    title=f"{selected_ticker} Actual vs Predicted Closing Prices",
-    labels={"Date": "Date", "value": "Closing Price ($)", "variable": "Legend"}
-)
+    # Calculate performance metrics only for historical data
+    if actual.any():
+        close = series["Close"][actual]
+        predicted = series["Predicted_Close"][actual]
+        mae = np.abs(close - predicted).mean()
+        direction_accuracy = float((series["Close_up"][actual][1:] == series["Pred_up"][actual][1:]).mean())
+        correlation = np.corrcoef(close, predicted)[0, 1]
 
-# Add future prediction if available
-if not future_prediction.empty:
-    fig.add_scatter(
-        x=future_prediction["Date"],
-        y=future_prediction["Predicted_Close"],
-        mode='markers',
-        name='Future Prediction',
-        marker=dict(color='red', size=10)
-    )
+        # Create metrics columns
+        metric_col1, metric_col2, metric_col3 = st.columns(3)
 
-fig.update_layout(
-    xaxis_title="Date",
-    yaxis_title="Closing Price ($)",
-    template="plotly_white"
-)
-st.plotly_chart(fig, use_container_width=True)
-
-# Show future prediction in a text box if available
-if not future_prediction.empty:
-    next_date = future_prediction["Date"].iloc[0].strftime('%Y-%m-%d')
-    next_pred = future_prediction["Predicted_Close"].iloc[0]
-    st.success(f"🚀 Next day prediction ({next_date}): ${next_pred:.2f}")
-
-# Calculate performance metrics only for historical data
-if not historical_data.empty:
-    mae = mean_absolute_error(
-        historical_data['Close'], 
-        historical_data['Predicted_Close']
-    )
-    direction_accuracy = accuracy_score(
-        (historical_data['Close'].diff() > 0).dropna(), 
-        (historical_data['Predicted_Close'].diff() > 0).dropna()
-    )
-    correlation = historical_data['Close'].corr(historical_data['Predicted_Close'])
-    
-    # Create metrics columns
-    metric_col1, metric_col2, metric_col3 = st.columns(3)
-
-    with metric_col1:
-        st.metric(
-            label="💰 Mean Absolute Error",
-            value=f"${mae:.2f}",
-            help="Average dollar difference between predicted and actual prices"
-        )
+        with metric_col1:
+            st.metric(
+                label="💰 Mean Absolute Error",
+                value=f"${mae:.2f}",
+                help="Average dollar difference between predicted and actual prices"
+            )
 
-    with metric_col2:
-        st.metric(
-            label="📈 Direction Accuracy",
-            value=f"{direction_accuracy:.1%}",
-            help="Percentage of correct up/down predictions"
-        )
+        with metric_col2:
+            st.metric(
+                label="📈 Direction Accuracy",
+                value=f"{direction_accuracy:.1%}",
+                help="Percentage of correct up/down predictions"
+            )
 
-    with metric_col3:
-        st.metric(
-            label="🔗 Price Correlation",
-            value=f"{correlation:.2f}",
-            help="Strength of relationship between predictions and reality (1 = perfect)"
-        )
+        with metric_col3:
+            st.metric(
+                label="🔗 Price Correlation",
+                value=f"{correlation:.2f}",
+                help="Strength of relationship between predictions and reality (1 = perfect)"
+            )
 
-    # Add performance insights
-    st.markdown("""
-    ### 📌 Model Performance Insights
-    - **When MAE < $2.00**: The model predictions are very close to actual market prices  
-    - **Direction Accuracy > 70%**: The model reliably predicts price movement direction  
-    - **Correlation > 0.85**: Strong linear relationship between predictions and actuals  
-    """)
-else:
-    st.warning("No historical data available for performance metrics.")
+        # Add performance insights
+        st.markdown("""
+        ### 📌 Model Performance Insights
+        - **When MAE < $2.00**: The model predictions are very close to actual market prices  
+        - **Direction Accuracy > 70%**: The model reliably predicts price movement direction  
+        - **Correlation > 0.85**: Strong linear relationship between predictions and actuals  
+        """)
+    else:
+        st.warning("No historical data available for performance metrics.")
 
-# Add disclaimer
-st.caption("Note: Metrics calculated for the selected date range and ticker only")
\ No newline at end of file
+    # Add disclaimer
+    st.caption("Note: Metrics calculated for the selected date range and ticker only")
+
+st.subheader("Predicted vs Actual Closing Price")
+if st.toggle("Show predicted vs actual", key="show_predictions"):
+    render_predictions_section()